@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark the image resize backends against every POSTER_SPECS size.
+
+Reports throughput (resizes per second) for each backend and output quality
+as PSNR against the pillow-lanczos reference (higher is closer; inf = identical).
+
+Usage:
+    python scripts/benchmark_resize.py
+    python scripts/benchmark_resize.py --source ./input/photo.jpg --repeat 20
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from media_processor import (
+    MediaProcessor,
+    POSTER_SPECS,
+    RESIZE_BACKENDS,
+    DEFAULT_RESIZE_BACKEND,
+    calculate_crop_box,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare throughput and quality of the image resize backends"
+    )
+    parser.add_argument(
+        "--source",
+        help="Source image to resize (default: synthetic test pattern)",
+    )
+    parser.add_argument(
+        "--size",
+        default="4000x3000",
+        help="Synthetic source size as WIDTHxHEIGHT (default: 4000x3000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=10,
+        help="Timed resizes per backend and poster size (default: 10)",
+    )
+    return parser.parse_args()
+
+
+def make_test_pattern(width: int, height: int) -> Image.Image:
+    """Build a smooth gradient with fine sine detail, so aliasing shows up in PSNR."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    r = 255 * x / max(width - 1, 1)
+    g = 255 * y / max(height - 1, 1)
+    b = 127.5 + 127.5 * np.sin((x * x + y * y) / (40.0 * max(width, height)))
+    pixels = np.stack([r, g, b], axis=-1).clip(0, 255).astype(np.uint8)
+    return Image.fromarray(pixels)
+
+
+def psnr(reference: Image.Image, candidate: Image.Image) -> float:
+    """Peak signal-to-noise ratio in dB between two same-size images."""
+    ref = np.asarray(reference, dtype=np.float64)
+    cand = np.asarray(candidate.convert(reference.mode), dtype=np.float64)
+    mse = np.mean((ref - cand) ** 2)
+    if mse == 0:
+        return float("inf")
+    return 10 * np.log10(255.0 ** 2 / mse)
+
+
+def main():
+    args = parse_args()
+
+    if args.source:
+        source = Image.open(args.source)
+        source.load()
+    else:
+        width, height = map(int, args.size.lower().split("x"))
+        source = make_test_pattern(width, height)
+
+    processors = {
+        backend: MediaProcessor(".", resize_backend=backend) for backend in RESIZE_BACKENDS
+    }
+
+    print(f"Source: {args.source or 'synthetic'} ({source.width}x{source.height}, {source.mode})")
+    print(f"Repeat: {args.repeat}")
+    print()
+    print(f"{'Poster':<12} {'Size':<10} {'Backend':<16} {'ms/resize':>10} {'resizes/s':>10} {'PSNR dB':>9}")
+    print("-" * 72)
+
+    totals = {backend: 0.0 for backend in RESIZE_BACKENDS}
+
+    for poster_name, (target_width, target_height) in POSTER_SPECS.items():
+        crop_box = calculate_crop_box(source.width, source.height, target_width, target_height)
+        reference = processors[DEFAULT_RESIZE_BACKEND]._resize_image(
+            source, crop_box, target_width, target_height
+        )
+
+        for backend, processor in processors.items():
+            # Warm-up run (also the output used for the quality comparison)
+            output = processor._resize_image(source, crop_box, target_width, target_height)
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                processor._resize_image(source, crop_box, target_width, target_height)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            totals[backend] += elapsed
+
+            print(
+                f"{poster_name:<12} {f'{target_width}x{target_height}':<10} {backend:<16} "
+                f"{elapsed * 1000:>10.1f} {1 / elapsed:>10.1f} {psnr(reference, output):>9.2f}"
+            )
+        print()
+
+    print("Total time per full poster set:")
+    for backend, total in totals.items():
+        speedup = totals[DEFAULT_RESIZE_BACKEND] / total if total > 0 else 0
+        print(f"  {backend:<16} {total * 1000:>8.1f} ms  ({speedup:.2f}x vs {DEFAULT_RESIZE_BACKEND})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,17 +9,31 @@ Environment:
     POSTER_INPUT_DIR: Override input directory
     POSTER_OUTPUT_DIR: Override output directory
     POSTER_BUILD_DIR: Override build directory
+    POSTER_RESIZE_BACKEND: Override image resize backend (used by --render only)
+    POSTER_PREFETCH_MB: Override read-ahead memory cap in MiB (0 disables prefetching)
+    POSTER_SPEC_FILE: JSON file with extra/overriding poster spec sets
+    POSTER_RENDER_DIR: Override render directory
 """
 import sys
 import os
+import mmap
 import argparse
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from media_processor import MediaProcessor, POSTER_SPECS
+from media_processor import (
+    MediaProcessor,
+    SPEC_SETS,
+    DEFAULT_SPEC_SET,
+    RESIZE_BACKENDS,
+    DEFAULT_RESIZE_BACKEND,
+    load_spec_sets,
+)
 from mod_generator import ModGenerator, ModConfig
+from prefetch import Prefetcher, DEFAULT_PREFETCH_BYTES, DEFAULT_IO_WORKERS
+from pipeline import Pipeline, Stage, DEFAULT_QUEUE_SIZE
 
 
 def parse_args():
@@ -47,71 +61,114 @@ def parse_args():
         default=5.0,
         help="Aspect ratio tolerance in percent (default: 5)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--resize-backend",
+        choices=RESIZE_BACKENDS,
+        default=os.getenv("POSTER_RESIZE_BACKEND", DEFAULT_RESIZE_BACKEND),
+        help=f"Image resize backend for --render variants; mod folders get the original files (default: {DEFAULT_RESIZE_BACKEND})",
+    )
+    parser.add_argument(
+        "--spec-file",
+        default=os.getenv("POSTER_SPEC_FILE"),
+        help='JSON file of spec sets, e.g. {"hd": {"Poster1": [1278, 976], ...}}',
+    )
+    parser.add_argument(
+        "--spec-set",
+        default=DEFAULT_SPEC_SET,
+        help=f"Spec set (poster layout) used for media selection (default: {DEFAULT_SPEC_SET})",
+    )
+    parser.add_argument(
+        "--render",
+        nargs="+",
+        default=[],
+        metavar="SPEC_SET",
+        help=f"Also render cropped/resized variants for these spec sets (built-in: {', '.join(SPEC_SETS)})",
+    )
+    parser.add_argument(
+        "--render-dir",
+        default=os.getenv("POSTER_RENDER_DIR", "./renders"),
+        help="Output directory for rendered variants (<render-dir>/<spec set>/<mod>/)",
+    )
+    parser.add_argument(
+        "--prefetch-mb",
+        type=int,
+        # String default: argparse runs it through type=int, so a bad env value is a usage error
+        default=os.getenv("POSTER_PREFETCH_MB", str(DEFAULT_PREFETCH_BYTES // (1024 * 1024))),
+        help="Memory cap in MiB for reading source files ahead (0 disables, default: %(default)s)",
+    )
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        default=DEFAULT_IO_WORKERS,
+        help=f"Threads for media discovery and read-ahead (default: {DEFAULT_IO_WORKERS})",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"Mods buffered between pipeline stages (default: {DEFAULT_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--phased",
+        action="store_true",
+        help="Run selection, processing and packaging one after another instead of overlapping them",
+    )
+    args = parser.parse_args()
+    # argparse checks choices on the command line only, not on the env-provided default
+    if args.resize_backend not in RESIZE_BACKENDS:
+        parser.error(
+            f"invalid POSTER_RESIZE_BACKEND '{args.resize_backend}' (choose from {', '.join(RESIZE_BACKENDS)})"
+        )
+    return args
 
 
-def main():
-    args = parse_args()
-    
-    print("=" * 60)
-    print("BikininjaPosters Mod Generator")
-    print("=" * 60)
-    print(f"Input directory:  {args.input}")
-    print(f"Output directory: {args.output}")
-    print(f"Build directory:  {args.build}")
-    print()
-    
-    # Step 1: Discover media
-    print("[1/4] Discovering media files...")
-    processor = MediaProcessor(args.input, tolerance_percent=args.tolerance)
-    media_list = processor.discover_media()
-    print(f"Found {len(media_list)} media files")
-    
-    if not media_list:
-        print("✗ No media files found. Exiting.")
-        return 1
-    
-    # Print summary
-    video_count = sum(1 for m in media_list if m.is_video)
-    image_count = sum(1 for m in media_list if m.is_image)
-    print(f"  - Videos: {video_count}")
-    print(f"  - Images: {image_count}")
-    print()
-    
-    # Step 2: Load existing usage
-    print("[2/4] Loading existing mod data...")
-    mod_gen = ModGenerator(args.output)
-    mod_gen.load_existing_usage()
-    used_media = mod_gen.get_media_used_by_mods()
-    
-    # Also add media from version tracker
-    for media_path in mod_gen.version_tracker.used_media:
-        used_media.add(media_path)
-        processor.used_media.add(media_path)
+def render_mod_variants(processor, mod_config, media_dict, spec_sets, render_sets, render_dir, source_data=None):
+    """
+    Render every selected source of a mod for all requested spec sets, decoding each source once.
+    `source_data` maps file path to contents already read (shared with the copy step).
+    """
+    source_data = source_data or {}
+    media_by_path = {media.file_path: media for media in processor.media_list}
     
-    print(f"Already used: {len(used_media)} media files")
-    print()
-    
-    # Step 3: Assign media to new mods
-    print("[3/4] Assigning media to posters and creating mods...")
-    num_new_mods = len(media_list) // 6
-    
-    if num_new_mods == 0:
-        print("✗ Not enough media to create a mod (need 6, have {})".format(len(media_list)))
-        return 1
-    
-    print(f"Will create {num_new_mods} new mod(s)")
-    print()
+    for poster_name, media_path in media_dict.items():
+        media = media_by_path[media_path]
+        extension = ".mp4" if media.is_video else ".png"
+        
+        targets = {}
+        for set_name in render_sets:
+            if poster_name not in spec_sets[set_name]:
+                continue
+            variant_dir = os.path.join(render_dir, set_name, mod_config.mod_name)
+            Path(variant_dir).mkdir(parents=True, exist_ok=True)
+            targets[os.path.join(variant_dir, poster_name + extension)] = spec_sets[set_name][poster_name]
+        
+        if not targets:
+            continue
+        
+        for output_path, ok in processor.render_targets(media, targets, data=source_data.get(media_path)).items():
+            if ok:
+                print(f"  ✓ Rendered {os.path.relpath(output_path, render_dir)}")
+            else:
+                print(f"  ✗ Failed to render {os.path.relpath(output_path, render_dir)}")
+
+
+def select_mods(processor, mod_gen, poster_names, num_new_mods, prefetcher=None):
+    """
+    Select media for each new mod and yield (mod_config, media_dict) as soon as its slots are filled.
     
-    created_mods = []
-    poster_names = list(POSTER_SPECS.keys())
+    Selection needs the complete media list, so it starts once discovery is done;
+    mods are then handed downstream one at a time.
+    """
+    # Mod numbers are assigned up front: the mod folders appear later, in the process stage
+    first_mod_number = mod_gen.get_next_mod_number()
     
     for mod_idx in range(num_new_mods):
-        mod_number = mod_gen.get_next_mod_number()
-        next_version = mod_gen.version_tracker.get_next_version(mod_number)
+        mod_number = first_mod_number + mod_idx
+        # Only peeked: the version is recorded once the mod folder is written (process stage)
+        next_version = mod_gen.version_tracker.peek_next_version(mod_number)
         
         mod_config = ModConfig(mod_number, next_version)
-        print(f"Creating {mod_config.mod_name} (v{next_version})...")
+        print(f"Selecting media for {mod_config.mod_name} (v{next_version})...")
         
         # Intelligently select media for this mod using smart aspect ratio matching
         media_dict = {}
@@ -123,7 +180,7 @@ def main():
             if media.is_video and media.file_path not in processor.used_media:
                 selected_videos.append(media)
         
-        # Select media for all 6 poster positions
+        # Select media for all poster positions
         video_selected = False
         for poster_idx, poster_name in enumerate(poster_names):
             # For the first poster where we haven't selected a video yet, prefer video (but don't require it if unavailable)
@@ -150,26 +207,172 @@ def main():
                     processor.used_media.discard(media_path)
                 break
         
-        # Ensure we got all 6 positions filled and have at least one video
-        if len(media_dict) < 6:
-            print(f"  ✗ Could not fill all poster positions (got {len(media_dict)}/6)")
-            break
+        # Ensure we got all positions filled and have at least one video
+        if len(media_dict) < len(poster_names):
+            print(f"  ✗ Could not fill all poster positions (got {len(media_dict)}/{len(poster_names)})")
+            return
         
         if not has_video:
             print(f"  ⚠ No video in this mod (ideally needs ≥1, but proceeding with images only)")
             # Note: In production, you should have at least 1 video per mod for better presentation
         
+        if prefetcher:
+            prefetcher.add(media_dict.values())
+        
+        yield mod_config, media_dict
+
+
+def process_mod(processor, mod_gen, planned, spec_sets, args):
+    """Pipeline stage: write a selected mod's assets. Returns the ModConfig, or None on failure."""
+    mod_config, media_dict = planned
+    
+    # When rendering too, take each source from the prefetcher once and feed both the copy and the render
+    source_data = {}
+    if args.render and mod_gen.prefetcher:
+        for media_path in media_dict.values():
+            data = mod_gen.prefetcher.get(media_path)
+            if data is not None:
+                source_data[media_path] = data
+    
+    try:
         # Create mod structure
-        if mod_gen.create_mod_structure(mod_config, media_dict):
-            # Mark all media as used in version tracker for future runs
-            for media_path in media_dict.values():
-                mod_gen.version_tracker.mark_media_used(media_path)
-            created_mods.append(mod_config)
-        else:
-            print(f"  ✗ Failed to create mod structure")
-            # Revert used_media since structure creation failed
-            for media_path in media_dict.values():
-                processor.used_media.discard(media_path)
+        if not mod_gen.create_mod_structure(mod_config, media_dict, source_data=source_data):
+            print(f"  ✗ Failed to create mod structure for {mod_config.mod_name}")
+            return None
+        
+        # Record the version and mark all media as used in version tracker for future runs
+        mod_gen.version_tracker.set_version(mod_config.mod_number, mod_config.version)
+        for media_path in media_dict.values():
+            mod_gen.version_tracker.mark_media_used(media_path)
+        
+        if args.render:
+            render_mod_variants(
+                processor, mod_config, media_dict, spec_sets, args.render, args.render_dir, source_data
+            )
+    finally:
+        for data in source_data.values():
+            if isinstance(data, mmap.mmap):
+                data.close()
+    
+    return mod_config
+
+
+def package_mod(mod_gen, mod_config, build_dir):
+    """Pipeline stage: zip a created mod. Returns the ModConfig (archive errors are reported, not fatal)."""
+    archive_path = mod_gen.create_mod_archive(mod_config, build_dir)
+    if archive_path:
+        print(f"  ✓ {mod_config.mod_name}-v{mod_config.version}.zip")
+    return mod_config
+
+
+def main():
+    args = parse_args()
+    
+    try:
+        spec_sets = load_spec_sets(args.spec_file) if args.spec_file else SPEC_SETS
+    except (OSError, ValueError) as e:
+        print(f"✗ Invalid spec file: {e}")
+        return 1
+    for set_name in [args.spec_set, *args.render]:
+        if set_name not in spec_sets:
+            print(f"✗ Unknown spec set '{set_name}' (available: {', '.join(spec_sets)})")
+            return 1
+    poster_specs = spec_sets[args.spec_set]
+    
+    print("=" * 60)
+    print("BikininjaPosters Mod Generator")
+    print("=" * 60)
+    print(f"Input directory:  {args.input}")
+    print(f"Output directory: {args.output}")
+    print(f"Build directory:  {args.build}")
+    print(f"Spec set:         {args.spec_set}")
+    if args.render:
+        print(f"Render sets:      {', '.join(args.render)} -> {args.render_dir}")
+    elif args.resize_backend != DEFAULT_RESIZE_BACKEND:
+        print(f"⚠ --resize-backend {args.resize_backend} has no effect without --render")
+    print()
+    
+    # Step 1: Discover media
+    print("[1/4] Discovering media files...")
+    processor = MediaProcessor(
+        args.input,
+        tolerance_percent=args.tolerance,
+        resize_backend=args.resize_backend,
+        poster_specs=poster_specs,
+    )
+    media_list = processor.discover_media(workers=args.io_workers)
+    print(f"Found {len(media_list)} media files")
+    
+    if not media_list:
+        print("✗ No media files found. Exiting.")
+        return 1
+    
+    # Print summary
+    video_count = sum(1 for m in media_list if m.is_video)
+    image_count = sum(1 for m in media_list if m.is_image)
+    print(f"  - Videos: {video_count}")
+    print(f"  - Images: {image_count}")
+    print()
+    
+    # Step 2: Load existing usage
+    print("[2/4] Loading existing mod data...")
+    mod_gen = ModGenerator(args.output)
+    mod_gen.load_existing_usage()
+    used_media = mod_gen.get_media_used_by_mods()
+    
+    # Also add media from version tracker
+    for media_path in mod_gen.version_tracker.used_media:
+        used_media.add(media_path)
+        processor.used_media.add(media_path)
+    
+    print(f"Already used: {len(used_media)} media files")
+    print()
+    
+    # Step 3: Assign media, create mods and archives
+    poster_names = list(poster_specs.keys())
+    num_new_mods = len(media_list) // len(poster_names)
+    
+    if num_new_mods == 0:
+        print("✗ Not enough media to create a mod (need {}, have {})".format(len(poster_names), len(media_list)))
+        return 1
+    
+    if args.phased:
+        print("[3/4] Assigning media, creating mods, then creating archives...")
+    else:
+        print("[3/4] Assigning media, creating mods and archives (pipelined)...")
+    print(f"Will create {num_new_mods} new mod(s)")
+    print()
+    
+    # Read selected sources ahead of the copy step (matters on slow/network storage)
+    prefetcher = None
+    if args.prefetch_mb > 0:
+        prefetcher = Prefetcher(max_bytes=args.prefetch_mb * 1024 * 1024, workers=args.io_workers)
+        processor.prefetcher = prefetcher
+        mod_gen.prefetcher = prefetcher
+    
+    # select -> process (copy + render) -> package (zip), with bounded queues in between
+    pipeline = Pipeline(
+        select_mods(processor, mod_gen, poster_names, num_new_mods, prefetcher),
+        [
+            Stage("process", lambda planned: process_mod(processor, mod_gen, planned, spec_sets, args)),
+            Stage("package", lambda mod_config: package_mod(mod_gen, mod_config, args.build)),
+        ],
+        queue_size=args.queue_size,
+        source_name="select",
+    )
+    
+    try:
+        created_mods = pipeline.run_phased() if args.phased else pipeline.run()
+    except BaseException:
+        # Interrupted or a stage failed: every stage has stopped, so record the
+        # versions and sources of mods already written before bailing out
+        mod_gen.version_tracker.save()
+        raise
+    finally:
+        if prefetcher:
+            prefetcher.close()
+            processor.prefetcher = None
+            mod_gen.prefetcher = None
     
     if not created_mods:
         print("✗ No mods were created.")
@@ -178,14 +381,13 @@ def main():
     print(f"\n✓ Created {len(created_mods)} mod(s)")
     print()
     
-    # Step 4: Create archives
-    print("[4/4] Creating mod archives...")
-    for mod_config in created_mods:
-        archive_path = mod_gen.create_mod_archive(mod_config, args.build)
-        if archive_path:
-            print(f"  ✓ {mod_config.mod_name}-v{mod_config.version}.zip")
+    print("Stage throughput:")
+    for stats in pipeline.stats:
+        print(f"  {stats.summary()}")
+    print()
     
-    # Save version tracking
+    # Step 4: Save version tracking
+    print("[4/4] Saving version tracking...")
     mod_gen.version_tracker.save()
     
     print()
@@ -3,11 +3,18 @@ Media processor for intelligent image/video resizing and cropping.
 Analyzes aspect ratios and selects best-fit media for each poster size.
 """
 import os
+import io
+import json
+import subprocess
 from pathlib import Path
 from typing import Tuple, Optional, List, Dict
 import math
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import cv2
+import numpy as np
+
+from prefetch import Buffer, Prefetcher
 
 
 # Target poster dimensions (width, height)
@@ -20,9 +27,95 @@ POSTER_SPECS = {
     "CustomTips": (860, 1219),
 }
 
+# Named spec sets (layout name -> poster name -> (width, height)).
+# "default" is the layout the mods ship with; "preview" is quarter-size
+# thumbnails of every slot for the Thunderstore page.
+SPEC_SETS = {
+    "default": POSTER_SPECS,
+    "preview": {name: (width // 4, height // 4) for name, (width, height) in POSTER_SPECS.items()},
+}
+DEFAULT_SPEC_SET = "default"
+
 SUPPORTED_IMAGE_FORMATS = {".png", ".jpg", ".jpeg", ".bmp"}
 SUPPORTED_VIDEO_FORMATS = {".mp4"}
 
+# Image resize backends (see MediaProcessor._resize_image)
+RESIZE_BACKENDS = ("pillow-lanczos", "pillow-reduce", "opencv-area")
+DEFAULT_RESIZE_BACKEND = "pillow-lanczos"
+
+# FFmpeg video encoding settings for every rendered output
+FFMPEG_ENCODE_ARGS = [
+    "-c:v", "libx264",
+    "-preset", "fast",
+    "-crf", "23",
+    "-c:a", "aac",
+]
+
+# Pillow modes opencv-area resizes without changing the output mode
+# (I;16 as uint16, RGBA with premultiplied alpha); others go through Pillow
+OPENCV_NATIVE_MODES = {"L", "I;16", "RGB", "RGBA"}
+
+
+def calculate_crop_box(
+    src_width: int, src_height: int, target_width: int, target_height: int
+) -> Tuple[int, int, int, int]:
+    """Return the centered (left, top, right, bottom) box matching the target aspect ratio."""
+    target_aspect = target_width / target_height
+    src_aspect = src_width / src_height
+    
+    if src_aspect > target_aspect:
+        # Image is wider: crop width
+        new_width = int(src_height * target_aspect)
+        left = (src_width - new_width) // 2
+        return (left, 0, left + new_width, src_height)
+    
+    # Image is taller: crop height
+    new_height = int(src_width / target_aspect)
+    top = (src_height - new_height) // 2
+    return (0, top, src_width, top + new_height)
+
+
+def _even(size: int) -> int:
+    """Round a video dimension down to even (libx264 4:2:0 requirement)."""
+    return max(2, size - size % 2)
+
+
+def _is_written(output_path: str) -> bool:
+    """True if an output file exists and is not empty."""
+    return os.path.isfile(output_path) and os.path.getsize(output_path) > 0
+
+
+def load_spec_sets(spec_file: str) -> Dict[str, Dict[str, Tuple[int, int]]]:
+    """
+    Load spec sets from a JSON file and merge them over the built-in SPEC_SETS.
+    
+    File format: {"set_name": {"Poster1": [width, height], ...}, ...}
+    Raises ValueError if the file does not match it or a size is not a positive integer pair.
+    """
+    with open(spec_file, "r") as f:
+        data = json.load(f)
+    
+    if not isinstance(data, dict):
+        raise ValueError(f"{spec_file}: expected an object of spec sets")
+    
+    spec_sets = dict(SPEC_SETS)
+    for set_name, specs in data.items():
+        if not isinstance(specs, dict) or not specs:
+            raise ValueError(f"{spec_file}: spec set '{set_name}' must map poster names to [width, height]")
+        spec_sets[set_name] = {}
+        for poster_name, size in specs.items():
+            if (
+                not isinstance(size, list)
+                or len(size) != 2
+                or not all(type(value) is int and value > 0 for value in size)
+            ):
+                raise ValueError(
+                    f"{spec_file}: size of {set_name}/{poster_name} must be a [width, height] "
+                    f"pair of positive integers, got {json.dumps(size)}"
+                )
+            spec_sets[set_name][poster_name] = (size[0], size[1])
+    return spec_sets
+
 
 class MediaInfo:
     """Store media file info and aspect ratio analysis."""
@@ -65,23 +158,50 @@ class MediaInfo:
 class MediaProcessor:
     """Process media: select best fit, crop, and resize for each poster."""
     
-    def __init__(self, input_dir: str, tolerance_percent: float = 5.0):
+    def __init__(
+        self,
+        input_dir: str,
+        tolerance_percent: float = 5.0,
+        resize_backend: str = DEFAULT_RESIZE_BACKEND,
+        poster_specs: Optional[Dict[str, Tuple[int, int]]] = None,
+    ):
+        if resize_backend not in RESIZE_BACKENDS:
+            raise ValueError(
+                f"Unknown resize backend '{resize_backend}' (expected one of: {', '.join(RESIZE_BACKENDS)})"
+            )
         self.input_dir = Path(input_dir)
         self.tolerance_percent = tolerance_percent
+        self.resize_backend = resize_backend
+        self.poster_specs = poster_specs if poster_specs is not None else POSTER_SPECS
         self.media_list: List[MediaInfo] = []
         self.used_media: set = set()
+        self.prefetcher: Optional[Prefetcher] = None  # Serves source reads when set
     
-    def discover_media(self) -> List[MediaInfo]:
-        """Find all supported media files in input directory."""
+    def discover_media(self, workers: int = 1) -> List[MediaInfo]:
+        """
+        Find all supported media files in input directory.
+        
+        Args:
+            workers: Threads used to analyze files; >1 overlaps cold header reads on slow storage
+        """
         self.media_list = []
         
+        candidates = []
         for file_path in self.input_dir.rglob("*"):
             if file_path.is_file():
                 ext = file_path.suffix.lower()
                 if ext in SUPPORTED_IMAGE_FORMATS or ext in SUPPORTED_VIDEO_FORMATS:
-                    media = MediaInfo(str(file_path))
-                    if media.width > 0 and media.height > 0:
-                        self.media_list.append(media)
+                    candidates.append(str(file_path))
+        
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                analyzed = list(pool.map(MediaInfo, candidates))
+        else:
+            analyzed = [MediaInfo(file_path) for file_path in candidates]
+        
+        for media in analyzed:
+            if media.width > 0 and media.height > 0:
+                self.media_list.append(media)
         
         return self.media_list
     
@@ -121,7 +241,7 @@ class MediaProcessor:
         Returns:
             Best matching MediaInfo or None if no suitable media found
         """
-        target_width, target_height = POSTER_SPECS[poster_name]
+        target_width, target_height = self.poster_specs[poster_name]
         target_aspect = target_width / target_height
         
         # If require_video, return first available video regardless of aspect ratio fit
@@ -188,82 +308,196 @@ class MediaProcessor:
         
         return False
     
+    def render_targets(
+        self, media: MediaInfo, targets: Dict[str, Tuple[int, int]], data: Optional[Buffer] = None
+    ) -> Dict[str, bool]:
+        """
+        Decode media once and write every target crop/size from that decode.
+        Images share one in-memory decoded buffer; videos use one FFmpeg run with one output per target.
+        
+        Args:
+            media: MediaInfo object
+            targets: Dict mapping output path to (width, height)
+            data: Source contents already read by the caller (images only; videos are read by FFmpeg)
+        
+        Returns:
+            Dict mapping output path to True if written, False otherwise
+        """
+        try:
+            if media.is_image:
+                return self._render_image_targets(media.file_path, targets, data=data)
+            elif media.is_video:
+                return self._render_video_targets(media.file_path, targets)
+        except Exception as e:
+            print(f"Error processing {media.file_path}: {e}")
+        
+        return {output_path: False for output_path in targets}
+    
     def _crop_resize_image(
         self, input_path: str, target_width: int, target_height: int, output_path: str
     ) -> bool:
         """Crop and resize image using PIL."""
-        img = Image.open(input_path)
-        src_width, src_height = img.size
-        target_aspect = target_width / target_height
-        src_aspect = src_width / src_height
-        
-        # Calculate crop box to match target aspect ratio
-        if src_aspect > target_aspect:
-            # Image is wider: crop width
-            new_width = int(src_height * target_aspect)
-            left = (src_width - new_width) // 2
-            crop_box = (left, 0, left + new_width, src_height)
-        else:
-            # Image is taller: crop height
-            new_height = int(src_width / target_aspect)
-            top = (src_height - new_height) // 2
-            crop_box = (0, top, src_width, top + new_height)
-        
-        # Crop then resize
-        cropped = img.crop(crop_box)
-        resized = cropped.resize((target_width, target_height), Image.Resampling.LANCZOS)
-        
-        # Determine output format
-        if output_path.lower().endswith(".png"):
-            resized.save(output_path, "PNG")
-        elif output_path.lower().endswith((".jpg", ".jpeg")):
-            resized.save(output_path, "JPEG", quality=95)
+        return self._render_image_targets(input_path, {output_path: (target_width, target_height)})[output_path]
+    
+    def _render_image_targets(
+        self, input_path: str, targets: Dict[str, Tuple[int, int]], data: Optional[Buffer] = None
+    ) -> Dict[str, bool]:
+        """Decode an image once, then crop and resize it for every target."""
+        if data is not None:
+            # Caller keeps ownership of data (e.g. an mmap shared with the copy step)
+            img = Image.open(io.BytesIO(data) if isinstance(data, bytes) else data)
+            img.load()
+        elif self.prefetcher:
+            with self.prefetcher.open(input_path) as source:
+                img = Image.open(source)
+                img.load()
         else:
-            resized.save(output_path)
+            img = Image.open(input_path)
+            img.load()
+        src_width, src_height = img.size
+        
+        # opencv-area: share one NumPy copy of the pixels across all targets
+        pixels = None
+        if self.resize_backend == "opencv-area" and img.mode in OPENCV_NATIVE_MODES:
+            pixels = self._opencv_pixels(img)
+        
+        results = {}
+        for output_path, (target_width, target_height) in targets.items():
+            try:
+                # Calculate crop box to match target aspect ratio
+                crop_box = calculate_crop_box(src_width, src_height, target_width, target_height)
+                
+                # Crop then resize
+                resized = self._resize_image(img, crop_box, target_width, target_height, pixels=pixels)
+                
+                # Determine output format
+                if output_path.lower().endswith(".png"):
+                    resized.save(output_path, "PNG")
+                elif output_path.lower().endswith((".jpg", ".jpeg")):
+                    resized.save(output_path, "JPEG", quality=95)
+                else:
+                    resized.save(output_path)
+                
+                results[output_path] = True
+            except Exception as e:
+                print(f"Error writing {output_path}: {e}")
+                results[output_path] = False
         
-        return True
+        return results
+    
+    def _opencv_pixels(self, img: Image.Image) -> np.ndarray:
+        """
+        Return a copy of img's pixels for cv2.resize (img.mode must be in OPENCV_NATIVE_MODES).
+        RGBA is returned as float32 with premultiplied alpha, like Pillow resamples it,
+        so colour hidden under transparent pixels does not bleed into the result.
+        """
+        pixels = np.asarray(img)
+        if img.mode == "RGBA":
+            pixels = pixels.astype(np.float32)
+            pixels[..., :3] *= pixels[..., 3:4] / 255.0
+        return pixels
+    
+    def _resize_image(
+        self,
+        img: Image.Image,
+        crop_box: Tuple[int, int, int, int],
+        target_width: int,
+        target_height: int,
+        pixels: Optional[np.ndarray] = None,
+    ) -> Image.Image:
+        """
+        Crop `img` to `crop_box` and resize it with the configured backend.
+        
+        Backends:
+            pillow-lanczos: plain LANCZOS on the cropped image (reference quality)
+            pillow-reduce: integer box reduce() first, then LANCZOS for the remainder
+            opencv-area: cv2.resize with INTER_AREA on a NumPy copy of the pixels
+                (modes outside OPENCV_NATIVE_MODES use pillow-lanczos instead)
+        
+        `pixels` is an optional precomputed _opencv_pixels(img), for opencv-area.
+        """
+        size = (target_width, target_height)
+        
+        if self.resize_backend == "pillow-reduce":
+            # resize(box=...) crops without an intermediate image, and reducing_gap
+            # lets Pillow apply reduce() before the final LANCZOS pass
+            # (reduce() has no 16-bit integer implementation)
+            reducing_gap = None if img.mode.startswith("I;16") else 2.0
+            return img.resize(size, Image.Resampling.LANCZOS, box=crop_box, reducing_gap=reducing_gap)
+        
+        if self.resize_backend == "opencv-area" and img.mode in OPENCV_NATIVE_MODES:
+            # One copy out of Pillow; the crop is a slice (view) of that buffer
+            if pixels is None:
+                pixels = self._opencv_pixels(img)
+            left, top, right, bottom = crop_box
+            cropped = pixels[top:bottom, left:right]
+            resized = cv2.resize(cropped, size, interpolation=cv2.INTER_AREA)
+            
+            if img.mode == "RGBA":
+                # Undo the premultiplication (fully transparent pixels stay black)
+                alpha = resized[..., 3:4]
+                np.divide(resized[..., :3] * 255.0, alpha, out=resized[..., :3], where=alpha > 0)
+                resized = np.clip(np.rint(resized), 0, 255).astype(np.uint8)
+            
+            return Image.fromarray(resized)
+        
+        return img.crop(crop_box).resize(size, Image.Resampling.LANCZOS)
     
     def _crop_resize_video(
         self, input_path: str, target_width: int, target_height: int, output_path: str
     ) -> bool:
         """Crop and resize video using OpenCV and FFmpeg."""
+        return self._render_video_targets(input_path, {output_path: (target_width, target_height)})[output_path]
+    
+    def _render_video_targets(self, input_path: str, targets: Dict[str, Tuple[int, int]]) -> Dict[str, bool]:
+        """
+        Crop and resize a video for every target in a single FFmpeg run (one decode).
+        
+        libx264 with 4:2:0 chroma needs even dimensions, so odd target sizes are
+        scaled one pixel smaller. If the combined run fails, each target is retried
+        on its own so one bad output does not fail the others.
+        """
         # Read first frame to get dimensions
         cap = cv2.VideoCapture(input_path)
         src_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         src_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
         cap.release()
         
-        target_aspect = target_width / target_height
-        src_aspect = src_width / src_height
-        
-        # Calculate crop dimensions
-        if src_aspect > target_aspect:
-            crop_width = int(src_height * target_aspect)
-            crop_height = src_height
-            crop_x = (src_width - crop_width) // 2
-            crop_y = 0
-        else:
-            crop_width = src_width
-            crop_height = int(src_width / target_aspect)
-            crop_x = 0
-            crop_y = (src_height - crop_height) // 2
+        # Calculate crop + scale filter for each target
+        filters = {}
+        for output_path, (target_width, target_height) in targets.items():
+            left, top, right, bottom = calculate_crop_box(src_width, src_height, target_width, target_height)
+            filters[output_path] = (
+                f"crop={right - left}:{bottom - top}:{left}:{top},"
+                f"scale={_even(target_width)}:{_even(target_height)}"
+            )
         
-        # Use FFmpeg to crop and resize (more efficient than OpenCV)
-        import subprocess
+        if len(filters) > 1 and self._run_ffmpeg(self._ffmpeg_split_cmd(input_path, filters)):
+            return {output_path: _is_written(output_path) for output_path in filters}
         
+        results = {}
+        for output_path, chain in filters.items():
+            results[output_path] = self._run_ffmpeg(
+                ["ffmpeg", "-i", input_path, "-vf", chain, *FFMPEG_ENCODE_ARGS, "-y", output_path]
+            ) and _is_written(output_path)
+        return results
+    
+    def _ffmpeg_split_cmd(self, input_path: str, filters: Dict[str, str]) -> List[str]:
+        """Decode once, split the frames, and give each branch its own crop/scale and output."""
+        labels = "".join(f"[s{idx}]" for idx in range(len(filters)))
+        branches = ";".join(f"[s{idx}]{chain}[v{idx}]" for idx, chain in enumerate(filters.values()))
         ffmpeg_cmd = [
             "ffmpeg",
             "-i", input_path,
-            "-vf", f"crop={crop_width}:{crop_height}:{crop_x}:{crop_y},scale={target_width}:{target_height}",
-            "-c:v", "libx264",
-            "-preset", "fast",
-            "-crf", "23",
-            "-c:a", "aac",
+            "-filter_complex", f"[0:v]split={len(filters)}{labels};{branches}",
             "-y",
-            output_path,
         ]
-        
+        for idx, output_path in enumerate(filters):
+            ffmpeg_cmd += ["-map", f"[v{idx}]", "-map", "0:a?", *FFMPEG_ENCODE_ARGS, output_path]
+        return ffmpeg_cmd
+    
+    def _run_ffmpeg(self, ffmpeg_cmd: List[str]) -> bool:
+        """Run FFmpeg, printing its error output on failure."""
         try:
             subprocess.run(ffmpeg_cmd, check=True, capture_output=True)
             return True
@@ -293,12 +527,12 @@ class MediaProcessor:
         
         # Assign one video if possible, rest images
         video_assigned = False
-        poster_order = ["Poster1", "Poster2", "Poster3", "Poster4", "Poster5", "CustomTips"]
+        poster_order = list(self.poster_specs)
         
         for idx, poster_name in enumerate(poster_order):
             if idx < len(media_set):
                 media = media_set[idx]
-                target_width, target_height = POSTER_SPECS[poster_name]
+                target_width, target_height = self.poster_specs[poster_name]
                 
                 # Determine output format
                 if media.is_video:
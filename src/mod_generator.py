@@ -4,10 +4,13 @@ Tracks version and ensures media uniqueness across mods.
 """
 import os
 import json
+import shutil
 import zipfile
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from prefetch import Buffer, Prefetcher, write_copy
+
 
 class ModConfig:
     """Configuration for a single mod pack."""
@@ -83,19 +86,22 @@ class VersionTracker:
         """Check if a source media file has been used."""
         return file_path in self.used_media
     
-    def get_next_version(self, mod_number: int) -> str:
-        """Get next version for a mod (e.g., 0.0.1, 0.0.2, ...)."""
+    def peek_next_version(self, mod_number: int) -> str:
+        """Return the next version for a mod (e.g., 0.0.1, 0.0.2, ...) without recording it."""
         mod_key = f"BikininjaPosters{mod_number:02d}"
-        
-        if mod_key not in self.versions:
-            self.versions[mod_key] = "0.0.0"
-        
-        current = self.versions[mod_key]
+        current = self.versions.get(mod_key, "0.0.0")
         parts = list(map(int, current.split(".")))
         parts[2] += 1  # Increment patch version
-        
-        next_version = ".".join(map(str, parts))
-        self.versions[mod_key] = next_version
+        return ".".join(map(str, parts))
+    
+    def set_version(self, mod_number: int, version: str):
+        """Record the version a mod was written with."""
+        self.versions[f"BikininjaPosters{mod_number:02d}"] = version
+    
+    def get_next_version(self, mod_number: int) -> str:
+        """Get next version for a mod (e.g., 0.0.1, 0.0.2, ...) and record it."""
+        next_version = self.peek_next_version(mod_number)
+        self.set_version(mod_number, next_version)
         return next_version
     
     def increment_version_for_mod(self, mod_number: int) -> str:
@@ -112,14 +118,21 @@ class ModGenerator:
         self.output_dir = output_dir
         self.version_tracker = VersionTracker(os.path.join(output_dir, "versions.json"))
         self.used_media = set()  # Track all media used across all mods
-    
-    def create_mod_structure(self, mod_config: ModConfig, media_files: Dict[str, str]) -> bool:
+        self.prefetcher: Optional[Prefetcher] = None  # Serves source copies when set
+    
+    def create_mod_structure(
+        self,
+        mod_config: ModConfig,
+        media_files: Dict[str, str],
+        source_data: Optional[Dict[str, Buffer]] = None,
+    ) -> bool:
         """
         Create BepInEx directory structure for a mod.
         
         Args:
             mod_config: ModConfig object
             media_files: Dict mapping poster_name to file path
+            source_data: Optional Dict mapping file path to contents already read by the caller
         
         Returns:
             True if successful
@@ -144,9 +157,14 @@ class ModGenerator:
                 
                 dest_path = os.path.join(dest_dir, dest_name)
                 
-                # Copy file
-                import shutil
-                shutil.copy2(file_path, dest_path)
+                # Copy file (from already-read contents or the prefetch buffer when available)
+                data = source_data.get(file_path) if source_data else None
+                if data is not None:
+                    write_copy(data, file_path, dest_path)
+                elif self.prefetcher:
+                    self.prefetcher.copy(file_path, dest_path)
+                else:
+                    shutil.copy2(file_path, dest_path)
                 
                 # Track used media
                 self.used_media.add(file_path)
@@ -0,0 +1,220 @@
+"""
+Streaming pipeline: each stage runs on its own thread, connected by bounded queues.
+Items flow downstream as soon as they are ready; a full queue blocks the producer (backpressure).
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional
+
+
+DEFAULT_QUEUE_SIZE = 2
+
+_DONE = object()  # End-of-stream marker passed down the queues
+
+
+class StageStats:
+    """Per-stage throughput counters."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0  # Time spent producing/processing items
+        self.blocked_seconds = 0.0  # Time spent waiting on a full downstream queue
+        self.started = 0.0
+        self.finished = 0.0
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return max(self.finished - self.started, 0.0)
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        """One-line report for the CLI."""
+        return (
+            f"{self.name:<10} {self.items:>4} item(s)  busy {self.busy_seconds:6.2f}s  "
+            f"blocked {self.blocked_seconds:6.2f}s  wall {self.elapsed_seconds:6.2f}s  "
+            f"({self.items_per_second:.2f} item/s)"
+        )
+
+
+class Stage:
+    """A named processing step. `func` returns the item to pass on, or None to drop it."""
+
+    def __init__(self, name: str, func: Callable[[Any], Optional[Any]]):
+        self.name = name
+        self.func = func
+
+
+class Pipeline:
+    """
+    Run a source iterable through a chain of stages.
+
+    Every stage keeps input order (one thread per stage). If a stage raises, it
+    and everything upstream of it stop taking new work (queued items are drained
+    unprocessed); items that already passed the failing stage still finish the
+    remaining stages. run() then re-raises the first error. An exception in the
+    calling thread (e.g. Ctrl-C) stops every stage, waits for in-progress items
+    to finish, and is re-raised.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: List[Stage],
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        source_name: str = "source",
+    ):
+        self.source = source
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.stats = [StageStats(source_name)] + [StageStats(stage.name) for stage in stages]
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._halted_upto = -1  # Index (0 = source) of the last stage told to stop taking work
+
+    def _halt(self, index: int):
+        """Stop the stage at `index` and every stage upstream of it."""
+        with self._lock:
+            self._halted_upto = max(self._halted_upto, index)
+
+    def _halted(self, index: int) -> bool:
+        return index <= self._halted_upto
+
+    def _fail(self, index: int, error: BaseException):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._halt(index)
+
+    def _put(self, out_queue: queue.Queue, item: Any, stats: StageStats):
+        start = time.perf_counter()
+        out_queue.put(item)
+        stats.blocked_seconds += time.perf_counter() - start
+
+    def _run_source(self, out_queue: queue.Queue, stats: StageStats):
+        stats.started = time.perf_counter()
+        try:
+            iterator = iter(self.source)
+            while not self._halted(0):
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    stats.busy_seconds += time.perf_counter() - start
+                stats.items += 1
+                self._put(out_queue, item, stats)
+        except BaseException as e:
+            self._fail(0, e)
+        finally:
+            out_queue.put(_DONE)
+            stats.finished = time.perf_counter()
+
+    def _run_stage(
+        self, index: int, stage: Stage, in_queue: queue.Queue, out_queue: queue.Queue, stats: StageStats
+    ):
+        stats.started = time.perf_counter()
+        while True:
+            item = in_queue.get()
+            if item is _DONE:
+                break
+            if self._halted(index):
+                continue  # Drain so upstream never blocks on a stopped stage
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except BaseException as e:
+                self._fail(index, e)
+                continue
+            finally:
+                stats.busy_seconds += time.perf_counter() - start
+            if result is not None:
+                stats.items += 1
+                self._put(out_queue, result, stats)
+        out_queue.put(_DONE)
+        stats.finished = time.perf_counter()
+
+    def run(self) -> List[Any]:
+        """Run all stages concurrently and return the last stage's outputs in order."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        queues.append(queue.Queue())  # Results: unbounded, drained below
+
+        threads = [
+            threading.Thread(target=self._run_source, args=(queues[0], self.stats[0]), name=self.stats[0].name)
+        ]
+        for idx, stage in enumerate(self.stages):
+            threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(idx + 1, stage, queues[idx], queues[idx + 1], self.stats[idx + 1]),
+                    name=stage.name,
+                )
+            )
+        for thread in threads:
+            thread.start()
+
+        results = []
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                results.append(item)
+        except BaseException:
+            # Interrupted: no stage takes new work; let in-progress items finish
+            self._halt(len(self.stages))
+            for thread in threads:
+                thread.join()
+            raise
+
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+        return results
+
+    def run_phased(self) -> List[Any]:
+        """
+        Run each stage to completion before the next one starts (no overlap).
+        Error handling matches run(): items that passed a failing stage finish the rest.
+        """
+        error: Optional[BaseException] = None
+
+        stats = self.stats[0]
+        stats.started = time.perf_counter()
+        items = []
+        try:
+            for item in self.source:
+                items.append(item)
+        except Exception as e:
+            error = e
+        stats.finished = time.perf_counter()
+        stats.busy_seconds = stats.elapsed_seconds
+        stats.items = len(items)
+
+        for stage, stats in zip(self.stages, self.stats[1:]):
+            stats.started = time.perf_counter()
+            results = []
+            for item in items:
+                try:
+                    result = stage.func(item)
+                except Exception as e:
+                    if error is None:
+                        error = e
+                    break
+                if result is not None:
+                    results.append(result)
+            stats.finished = time.perf_counter()
+            stats.busy_seconds = stats.elapsed_seconds
+            stats.items = len(results)
+            items = results
+
+        if error is not None:
+            raise error
+        return items
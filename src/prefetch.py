@@ -0,0 +1,252 @@
+"""
+Read-ahead prefetcher for source media on slow or network storage.
+Reads upcoming files in planned order on a background thread pool, within a memory cap.
+"""
+import io
+import os
+import mmap
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Deque, Dict, Iterable, Optional, Set, Union
+
+
+DEFAULT_PREFETCH_BYTES = 256 * 1024 * 1024
+DEFAULT_IO_WORKERS = 4
+
+Buffer = Union[bytes, mmap.mmap]
+Reader = Callable[[str], Buffer]
+
+
+def _advise_willneed(fd: int):
+    """Ask the kernel to start readahead for the whole file (no-op where unsupported)."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+
+
+def hint_file(path: str):
+    """Warm the page cache for a file without buffering it in this process."""
+    try:
+        with open(path, "rb") as f:
+            _advise_willneed(f.fileno())
+    except OSError:
+        pass
+
+
+def read_file(path: str) -> bytes:
+    """Read a whole file into memory, with readahead hints."""
+    with open(path, "rb") as f:
+        _advise_willneed(f.fileno())
+        return f.read()
+
+
+def read_mmap(path: str) -> Buffer:
+    """Map a whole file read-only, with readahead hints. Empty files return b""."""
+    with open(path, "rb") as f:
+        _advise_willneed(f.fileno())
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+        mapped.madvise(mmap.MADV_WILLNEED)
+    return mapped
+
+
+def write_copy(data: Buffer, path: str, dest_path: str):
+    """Write already-read contents of `path` to `dest_path`, keeping metadata like shutil.copy2."""
+    with open(dest_path, "wb") as f:
+        f.write(data)
+    shutil.copystat(path, dest_path)
+
+
+class ThrottledReader:
+    """
+    Wrap a reader with artificial latency and bandwidth, to mimic NFS locally.
+
+    Latency is paid per call and overlaps across threads; bandwidth is one shared
+    link, so concurrent calls queue behind each other for their transfer time.
+    """
+
+    def __init__(
+        self,
+        reader: Reader = read_file,
+        latency: float = 0.05,
+        bytes_per_second: Optional[float] = None,
+    ):
+        self.reader = reader
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self._lock = threading.Lock()
+        self._link_free_at = 0.0  # perf_counter() time the shared link becomes idle
+
+    def __call__(self, path: str) -> Buffer:
+        time.sleep(self.latency)
+        if self.bytes_per_second:
+            transfer = os.path.getsize(path) / self.bytes_per_second
+            with self._lock:
+                start = max(time.perf_counter(), self._link_free_at)
+                self._link_free_at = start + transfer
+                done_at = self._link_free_at
+            time.sleep(max(done_at - time.perf_counter(), 0.0))
+        return self.reader(path)
+
+
+class Prefetcher:
+    """
+    Read files ahead of the consumer, in planned order, within a memory cap.
+
+    Each planned file is read at most once. get() hands its buffer to the consumer
+    and frees that much of the budget, so the cap bounds data read ahead but not
+    yet consumed. Files requested before they were scheduled are read in the
+    caller's thread. Files larger than the cap (these only get a readahead hint),
+    unplanned files and failed reads return None: the caller falls back to the path.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str] = (),
+        max_bytes: int = DEFAULT_PREFETCH_BYTES,
+        workers: int = DEFAULT_IO_WORKERS,
+        reader: Reader = read_file,
+    ):
+        self.max_bytes = max_bytes
+        self.reader = reader
+        self._pending: Deque[str] = deque()
+        self._planned: Set[str] = set()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch")
+        self._cond = threading.Condition()
+        self._futures: Dict[str, Future] = {}
+        self._sizes: Dict[str, int] = {}
+        self._taken: Set[str] = set()
+        self._buffered_bytes = 0
+        self._closed = False
+        self._scheduler = threading.Thread(target=self._schedule, name="prefetch-scheduler", daemon=True)
+        self._scheduler.start()
+        self.add(paths)
+
+    def add(self, paths: Iterable[str]):
+        """Append files to the planned read order (files already planned are ignored)."""
+        with self._cond:
+            for path in paths:
+                if path not in self._planned:
+                    self._planned.add(path)
+                    self._pending.append(path)
+            self._cond.notify_all()
+
+    def _schedule(self):
+        """Submit reads in planned order, waiting while the budget is used up."""
+        while True:
+            with self._cond:
+                while not self._closed and not self._pending:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                path = self._pending.popleft()
+
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            if size > self.max_bytes:
+                # Too big to buffer: the consumer reads it, but the kernel can start early
+                self._pool.submit(hint_file, path)
+                continue
+
+            with self._cond:
+                while (
+                    not self._closed
+                    and path not in self._taken
+                    and self._buffered_bytes > 0
+                    and self._buffered_bytes + size > self.max_bytes
+                ):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                if path in self._taken:
+                    continue
+                self._buffered_bytes += size
+                self._sizes[path] = size
+                self._futures[path] = self._pool.submit(self.reader, path)
+
+    def get(self, path: str) -> Optional[Buffer]:
+        """Return the prefetched contents of `path`, blocking until read; None if not buffered."""
+        with self._cond:
+            first_request = path not in self._taken
+            self._taken.add(path)
+            future = self._futures.pop(path, None)
+            closed = self._closed
+            self._cond.notify_all()
+
+        if future is None:
+            # Planned but not scheduled yet: the scheduler will skip it, read it here
+            if first_request and not closed and path in self._planned:
+                return self._read_now(path)
+            return None
+
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Prefetch failed for {path}: {e}")
+            return None
+        finally:
+            with self._cond:
+                self._buffered_bytes -= self._sizes.pop(path)
+                self._cond.notify_all()
+
+    def _read_now(self, path: str) -> Optional[Buffer]:
+        """Read a planned file in the caller's thread, unless it is too big to buffer."""
+        try:
+            if os.path.getsize(path) > self.max_bytes:
+                return None
+            return self.reader(path)
+        except Exception as e:
+            print(f"Prefetch failed for {path}: {e}")
+            return None
+
+    def open(self, path: str) -> BinaryIO:
+        """
+        Return a binary file object for `path`, served from the prefetch buffer when possible.
+        The caller owns it (it may be an mmap or an open file): use it as a context manager.
+        """
+        data = self.get(path)
+        if data is None:
+            return open(path, "rb")
+        if isinstance(data, mmap.mmap):
+            return data
+        return io.BytesIO(data)
+
+    def copy(self, path: str, dest_path: str):
+        """Drop-in for shutil.copy2 that writes the prefetched bytes when available."""
+        data = self.get(path)
+        if data is None:
+            shutil.copy2(path, dest_path)
+            return
+
+        write_copy(data, path, dest_path)
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+    def close(self):
+        """Stop scheduling, cancel pending reads and drop unconsumed buffers."""
+        with self._cond:
+            self._closed = True
+            futures = list(self._futures.values())
+            self._futures.clear()
+            self._cond.notify_all()
+        for future in futures:
+            future.cancel()
+        self._scheduler.join()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
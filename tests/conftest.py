@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Modules live in src/ and are imported flat, as in scripts/
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -0,0 +1,116 @@
+import hashlib
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "generate_mods.py"
+
+
+@pytest.fixture
+def generate_mods():
+    spec = importlib.util.spec_from_file_location("generate_mods", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """14 small images with mixed aspect ratios: enough for two mods plus leftovers."""
+    path = tmp_path / "input"
+    path.mkdir()
+    sizes = [(640, 480), (730, 490), (300, 420), (290, 400), (220, 300), (430, 610), (800, 450)]
+    for idx in range(14):
+        width, height = sizes[idx % len(sizes)]
+        Image.new("RGB", (width + idx, height), (idx * 15, 100, 200 - idx * 10)).save(path / f"src{idx:02d}.png")
+    return path
+
+
+def tree_digest(root):
+    return {
+        str(path.relative_to(root)): hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in sorted(Path(root).rglob("*"))
+        if path.is_file()
+    }
+
+
+def run_cli(generate_mods, monkeypatch, input_dir, out_root, *extra):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "generate_mods.py",
+            "--input", str(input_dir),
+            "--output", str(out_root / "mods"),
+            "--build", str(out_root / "build"),
+            "--render-dir", str(out_root / "renders"),
+            *extra,
+        ],
+    )
+    return generate_mods.main()
+
+
+@pytest.mark.parametrize("extra", [(), ("--render", "default", "preview"), ("--prefetch-mb", "0")])
+def test_pipelined_output_matches_phased(generate_mods, monkeypatch, input_dir, tmp_path, extra):
+    assert run_cli(generate_mods, monkeypatch, input_dir, tmp_path / "phased", "--phased", *extra) == 0
+    assert run_cli(generate_mods, monkeypatch, input_dir, tmp_path / "piped", "--queue-size", "1", *extra) == 0
+
+    for name in ("mods", "build", "renders"):
+        assert tree_digest(tmp_path / "phased" / name) == tree_digest(tmp_path / "piped" / name)
+    assert (tmp_path / "piped" / "build" / "BikininjaPosters02-v0.0.1.zip").exists()
+    assert (tmp_path / "piped" / "mods" / "versions.json").exists()
+
+
+def test_stage_error_still_saves_versions(generate_mods, monkeypatch, input_dir, tmp_path):
+    def broken_archive(self, mod_config, archive_output_dir="build"):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(generate_mods.ModGenerator, "create_mod_archive", broken_archive)
+    with pytest.raises(RuntimeError):
+        run_cli(generate_mods, monkeypatch, input_dir, tmp_path)
+
+    tracking = json.loads((tmp_path / "mods" / "versions.json").read_text())
+    assert tracking["used_media"]  # Sources of the written mods are recorded as used
+    assert tracking["versions"]
+    for mod_name in tracking["versions"]:
+        assert (tmp_path / "mods" / mod_name).is_dir()
+
+
+@pytest.mark.parametrize("extra", [(), ("--phased",)])
+def test_interrupt_before_any_mod_records_no_versions(generate_mods, monkeypatch, input_dir, tmp_path, extra):
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(generate_mods, "process_mod", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        run_cli(generate_mods, monkeypatch, input_dir, tmp_path, *extra)
+
+    tracking = json.loads((tmp_path / "mods" / "versions.json").read_text())
+    assert tracking == {"versions": {}, "used_media": []}
+
+    monkeypatch.undo()
+    assert run_cli(generate_mods, monkeypatch, input_dir, tmp_path, *extra) == 0
+    assert (tmp_path / "build" / "BikininjaPosters01-v0.0.1.zip").exists()
+
+
+@pytest.mark.parametrize(
+    "env, value",
+    [("POSTER_RESIZE_BACKEND", "bogus"), ("POSTER_PREFETCH_MB", "lots")],
+)
+def test_bad_env_defaults_are_usage_errors(generate_mods, monkeypatch, input_dir, tmp_path, env, value):
+    monkeypatch.setenv(env, value)
+    with pytest.raises(SystemExit) as exc_info:
+        run_cli(generate_mods, monkeypatch, input_dir, tmp_path)
+    assert exc_info.value.code == 2
+    assert not (tmp_path / "mods").exists()
+
+
+def test_invalid_spec_file_is_reported(generate_mods, monkeypatch, input_dir, tmp_path, capsys):
+    spec_file = tmp_path / "specs.json"
+    spec_file.write_text('{"hd": {"Poster1": [1278, 0]}}')
+    assert run_cli(generate_mods, monkeypatch, input_dir, tmp_path, "--spec-file", str(spec_file)) == 1
+    assert "✗ Invalid spec file" in capsys.readouterr().out
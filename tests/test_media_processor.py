@@ -0,0 +1,164 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from media_processor import MediaProcessor, RESIZE_BACKENDS, SPEC_SETS, load_spec_sets
+
+
+def resize(img, backend, size):
+    processor = MediaProcessor(".", resize_backend=backend)
+    return processor._resize_image(img, (0, 0, img.width, img.height), *size)
+
+
+@pytest.mark.parametrize("backend", RESIZE_BACKENDS)
+@pytest.mark.parametrize("mode", ["1", "L", "LA", "P", "I;16", "RGB", "RGBA", "CMYK"])
+def test_resize_keeps_mode(backend, mode):
+    img = Image.new(mode, (120, 90))
+    resized = resize(img, backend, (40, 30))
+    assert resized.mode == mode
+    assert resized.size == (40, 30)
+
+
+@pytest.mark.parametrize("backend", RESIZE_BACKENDS)
+def test_resize_keeps_16_bit_range(backend):
+    gradient = np.tile(np.linspace(0, 65535, 400).astype(np.uint16), (300, 1))
+    resized = resize(Image.fromarray(gradient), backend, (100, 75))
+    assert resized.mode == "I;16"
+    assert np.asarray(resized).mean() == pytest.approx(32767, rel=0.01)
+
+
+@pytest.mark.parametrize("backend", RESIZE_BACKENDS)
+def test_resize_does_not_leak_transparent_colour(backend):
+    # Transparent red stripes next to opaque green: red must not show up
+    pixels = np.zeros((100, 100, 4), np.uint8)
+    pixels[:, ::2] = [255, 0, 0, 0]
+    pixels[:, 1::2] = [0, 255, 0, 255]
+    resized = np.asarray(resize(Image.fromarray(pixels), backend, (50, 50)))
+    r, g, b, a = resized[10, 10]
+    assert r <= 2 and g >= 253 and b <= 2
+    assert 120 <= a <= 135
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        MediaProcessor(".", resize_backend="nope")
+
+
+def test_load_spec_sets_merges_over_builtin(tmp_path):
+    spec_file = tmp_path / "specs.json"
+    spec_file.write_text('{"hd": {"Poster1": [1278, 976]}}')
+    spec_sets = load_spec_sets(str(spec_file))
+    assert spec_sets["hd"] == {"Poster1": (1278, 976)}
+    assert spec_sets["default"] == SPEC_SETS["default"]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"hd": {"Poster1": [1278, 0]}}',
+        '{"hd": {"Poster1": [-5, 976]}}',
+        '{"hd": {"Poster1": [1278]}}',
+        '{"hd": {"Poster1": 1278}}',
+        '{"hd": {"Poster1": [12.5, 976]}}',
+        '{"hd": {"Poster1": [true, 976]}}',
+        '{"hd": {}}',
+        '[1, 2]',
+    ],
+)
+def test_load_spec_sets_rejects_bad_sizes(tmp_path, content):
+    spec_file = tmp_path / "specs.json"
+    spec_file.write_text(content)
+    with pytest.raises(ValueError):
+        load_spec_sets(str(spec_file))
+
+
+@pytest.fixture
+def image_file(tmp_path):
+    path = tmp_path / "source.png"
+    Image.new("RGB", (400, 300), (10, 20, 30)).save(path)
+    return path
+
+
+def image_media(path):
+    from media_processor import MediaInfo
+
+    return MediaInfo(str(path))
+
+
+def test_render_targets_reports_each_target(image_file, tmp_path):
+    good = str(tmp_path / "good.png")
+    bad = str(tmp_path / "bad.unknownext")
+    results = MediaProcessor(".").render_targets(
+        image_media(image_file), {good: (100, 80), bad: (50, 40)}
+    )
+    assert results == {good: True, bad: False}
+    assert Image.open(good).size == (100, 80)
+
+
+def test_render_targets_uses_given_data(image_file, tmp_path):
+    media = image_media(image_file)
+    data = image_file.read_bytes()
+    image_file.unlink()  # Any read from disk would now fail
+    output = str(tmp_path / "out.png")
+    assert MediaProcessor(".").render_targets(media, {output: (60, 45)}, data=data) == {output: True}
+
+
+class FakeCapture:
+    def __init__(self, path):
+        pass
+
+    def get(self, prop):
+        import cv2
+
+        return {cv2.CAP_PROP_FRAME_WIDTH: 1920, cv2.CAP_PROP_FRAME_HEIGHT: 1080}.get(prop, 30)
+
+    def release(self):
+        pass
+
+
+def fake_ffmpeg(calls, failing_output=None):
+    """Stand-in for subprocess.run: writes every output unless the command includes failing_output."""
+    import subprocess
+
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        if failing_output in cmd:
+            raise subprocess.CalledProcessError(1, cmd, stderr=b"encoder error")
+        outputs = [arg for arg in cmd if arg.endswith(".mp4") and arg != "in.mp4"]
+        for output in outputs:
+            with open(output, "wb") as f:
+                f.write(b"video")
+
+    return run
+
+
+def test_video_targets_use_even_sizes_and_one_run(monkeypatch, tmp_path):
+    import media_processor
+
+    calls = []
+    monkeypatch.setattr(media_processor.cv2, "VideoCapture", FakeCapture)
+    monkeypatch.setattr(media_processor.subprocess, "run", fake_ffmpeg(calls))
+    targets = {str(tmp_path / "a.mp4"): (639, 488), str(tmp_path / "b.mp4"): (159, 122)}
+
+    results = MediaProcessor(".")._render_video_targets("in.mp4", targets)
+
+    assert results == {path: True for path in targets}
+    assert len(calls) == 1
+    filter_graph = calls[0][calls[0].index("-filter_complex") + 1]
+    assert "scale=638:488" in filter_graph and "scale=158:122" in filter_graph
+
+
+def test_video_target_failure_is_isolated(monkeypatch, tmp_path):
+    import media_processor
+
+    calls = []
+    bad = str(tmp_path / "bad.mp4")
+    good = str(tmp_path / "good.mp4")
+    monkeypatch.setattr(media_processor.cv2, "VideoCapture", FakeCapture)
+    monkeypatch.setattr(media_processor.subprocess, "run", fake_ffmpeg(calls, failing_output=bad))
+
+    results = MediaProcessor(".")._render_video_targets("in.mp4", {good: (640, 480), bad: (320, 240)})
+
+    # Combined run fails, then each target is retried on its own
+    assert results == {good: True, bad: False}
+    assert len(calls) == 3
@@ -0,0 +1,132 @@
+import random
+import signal
+import threading
+import time
+
+import pytest
+
+from pipeline import Pipeline, Stage
+
+
+def jittered(func, max_delay=0.01, seed=0):
+    rng = random.Random(seed)
+    delays = [rng.uniform(0, max_delay) for _ in range(1000)]
+
+    def run(item):
+        time.sleep(delays[item % len(delays)])
+        return func(item)
+
+    return run
+
+
+def test_keeps_order_with_uneven_delays():
+    pipeline = Pipeline(
+        range(40),
+        [
+            Stage("double", jittered(lambda x: x * 2, seed=1)),
+            Stage("odd_only", jittered(lambda x: x + 1 if x % 4 else None, seed=2)),
+        ],
+        queue_size=1,
+    )
+    assert pipeline.run() == [x * 2 + 1 for x in range(40) if (x * 2) % 4]
+    assert [stats.items for stats in pipeline.stats] == [40, 40, 20]
+
+
+def test_full_queue_blocks_producer():
+    produced = []
+    release = threading.Event()
+
+    def source():
+        for item in range(20):
+            produced.append(item)
+            yield item
+
+    def blocked(item):
+        release.wait()
+        return item
+
+    pipeline = Pipeline(source(), [Stage("blocked", blocked)], queue_size=2)
+    runner = threading.Thread(target=pipeline.run)
+    runner.start()
+    time.sleep(0.2)
+
+    # One item in the stage, two in the queue, one waiting on put()
+    assert len(produced) <= 4
+    release.set()
+    runner.join(timeout=5)
+    assert len(produced) == 20
+    assert pipeline.stats[0].blocked_seconds > 0.1
+
+
+def test_stage_error_propagates_and_stops_upstream():
+    produced = []
+
+    def source():
+        for item in range(100):
+            produced.append(item)
+            yield item
+
+    def fail_on_3(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item
+
+    pipeline = Pipeline(source(), [Stage("check", fail_on_3)], queue_size=1)
+    with pytest.raises(ValueError, match="bad item"):
+        pipeline.run()
+    assert len(produced) < 100
+
+
+def test_source_error_propagates():
+    def source():
+        yield 1
+        raise RuntimeError("discovery failed")
+
+    with pytest.raises(RuntimeError, match="discovery failed"):
+        Pipeline(source(), [Stage("noop", lambda x: x)]).run()
+
+
+@pytest.mark.parametrize("phased", [False, True])
+def test_items_past_failed_stage_finish_downstream(phased):
+    packaged = []
+
+    def create(item):
+        if item == 3:
+            raise ValueError("create failed")
+        return item
+
+    def package(item):
+        packaged.append(item)
+        return item
+
+    pipeline = Pipeline(range(10), [Stage("create", create), Stage("package", package)], queue_size=4)
+    with pytest.raises(ValueError):
+        pipeline.run_phased() if phased else pipeline.run()
+    # Everything created before the failure still gets packaged
+    assert packaged == [0, 1, 2]
+
+
+def test_interrupt_stops_all_stages():
+    processed = []
+
+    def slow(item):
+        time.sleep(0.1)
+        processed.append(item)
+        return item
+
+    pipeline = Pipeline(range(30), [Stage("slow", slow)], queue_size=2)
+    main_thread = threading.main_thread().ident
+    timer = threading.Timer(0.25, signal.pthread_kill, args=(main_thread, signal.SIGINT))
+
+    start = time.monotonic()
+    timer.start()
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run()
+    elapsed = time.monotonic() - start
+
+    # Returns once the in-progress item finishes, with no stage thread left running
+    assert elapsed < 1.0
+    count = len(processed)
+    time.sleep(0.3)
+    assert len(processed) == count < 30
+    assert not [t for t in threading.enumerate() if t.name in ("source", "slow")]
@@ -0,0 +1,143 @@
+import mmap
+import threading
+import time
+
+import pytest
+
+from prefetch import Prefetcher, ThrottledReader, read_file, read_mmap
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = []
+    for idx in range(6):
+        path = tmp_path / f"src{idx}.bin"
+        path.write_bytes(bytes([idx]) * 100)
+        paths.append(str(path))
+    return paths
+
+
+class RecordingReader:
+    """Reader that records calls and can be held until released."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        with self._lock:
+            self.calls.append(path)
+        self.release.wait()
+        time.sleep(self.delay)
+        return read_file(path)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_reads_in_planned_order_and_returns_contents(sources):
+    reader = RecordingReader()
+    with Prefetcher(sources, workers=1, reader=reader) as prefetcher:
+        for idx, path in enumerate(sources):
+            assert prefetcher.get(path) == bytes([idx]) * 100
+    assert reader.calls == sources
+
+
+def test_byte_cap_limits_read_ahead(sources):
+    reader = RecordingReader()
+    reader.release.clear()
+    with Prefetcher(sources, max_bytes=250, workers=4, reader=reader) as prefetcher:
+        # Only two 100-byte files fit in 250 bytes until the consumer takes one
+        assert wait_for(lambda: len(reader.calls) == 2)
+        time.sleep(0.1)
+        assert len(reader.calls) == 2
+
+        reader.release.set()
+        assert prefetcher.get(sources[0]) == bytes([0]) * 100
+        assert wait_for(lambda: len(reader.calls) == 3)
+        assert prefetcher._buffered_bytes <= 250
+
+
+def test_get_before_scheduled_reads_in_caller(sources):
+    reader = RecordingReader()
+    reader.release.clear()
+    with Prefetcher(sources, max_bytes=100, workers=1, reader=reader) as prefetcher:
+        assert wait_for(lambda: len(reader.calls) == 1)
+        # sources[3] is planned but blocked behind the cap: read it now, once
+        reader.release.set()
+        assert prefetcher.get(sources[3]) == bytes([3]) * 100
+        for path in sources:
+            if path != sources[3]:
+                prefetcher.get(path)
+    assert reader.calls.count(sources[3]) == 1
+
+
+def test_oversize_and_unplanned_files_fall_back_to_path(sources, tmp_path):
+    big = tmp_path / "big.bin"
+    big.write_bytes(b"x" * 1000)
+    reader = RecordingReader()
+    with Prefetcher([str(big)], max_bytes=500, reader=reader) as prefetcher:
+        assert prefetcher.get(str(big)) is None
+        assert prefetcher.get(sources[0]) is None
+
+        dest = tmp_path / "copy.bin"
+        prefetcher.copy(str(big), str(dest))
+        assert dest.read_bytes() == big.read_bytes()
+    assert reader.calls == []
+
+
+def test_second_get_returns_none(sources):
+    with Prefetcher(sources[:1]) as prefetcher:
+        assert prefetcher.get(sources[0]) is not None
+        assert prefetcher.get(sources[0]) is None
+
+
+def test_close_with_reads_in_flight(sources):
+    reader = RecordingReader(delay=0.2)
+    prefetcher = Prefetcher(sources, max_bytes=10_000, workers=2, reader=reader)
+    assert wait_for(lambda: len(reader.calls) >= 1)
+
+    start = time.monotonic()
+    prefetcher.close()
+    # Running reads finish, queued ones are cancelled
+    assert time.monotonic() - start < 0.6
+    assert len(reader.calls) <= 4
+    assert prefetcher.get(sources[-1]) is None
+
+
+def test_open_mmap_is_closed_by_context_manager(sources):
+    with Prefetcher(sources[:1], reader=read_mmap) as prefetcher:
+        with prefetcher.open(sources[0]) as f:
+            assert isinstance(f, mmap.mmap)
+            assert f.read() == bytes([0]) * 100
+        assert f.closed
+
+
+def test_throttled_reader_shares_bandwidth(sources):
+    # 6 x 100 bytes over one 2000 B/s link takes ~0.3 s however many threads read
+    reader = ThrottledReader(latency=0.0, bytes_per_second=2000)
+    threads = [threading.Thread(target=reader, args=(path,)) for path in sources]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - start >= 0.28
+
+
+def test_throttled_reader_latency_overlaps(sources):
+    reader = ThrottledReader(latency=0.2)
+    start = time.monotonic()
+    with Prefetcher(sources, workers=6, reader=reader) as prefetcher:
+        for path in sources:
+            prefetcher.get(path)
+    assert time.monotonic() - start < 0.2 * len(sources) / 2